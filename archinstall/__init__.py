@@ -22,7 +22,8 @@ from .lib.hardware import SysInfo, AVAILABLE_GFX_DRIVERS
 from .lib.installer import Installer, accessibility_tools_in_use
 from .lib.output import (
 	FormattedOutput, log, error,
-	check_log_permissions, debug, warn, info
+	check_log_permissions, debug, warn, info,
+	set_verbose
 )
 from .lib.storage import storage
 from .lib.global_menu import GlobalMenu
@@ -254,6 +255,8 @@ def load_config():
 
 def post_process_arguments(arguments):
 	storage['arguments'] = arguments
+	set_verbose(bool(arguments.get('verbose', False)))
+
 	if mountpoint := arguments.get('mount_point', None):
 		storage['MOUNT_POINT'] = Path(mountpoint)
 
@@ -36,5 +36,9 @@ class PackageError(BaseException):
 	pass
 
 
+class PacmanLockTimeout(BaseException):
+	pass
+
+
 class Deprecated(BaseException):
 	pass
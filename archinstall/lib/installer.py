@@ -19,7 +19,7 @@ from .mirrors import use_mirrors, MirrorConfiguration, add_custom_mirrors
 from .models.bootloader import Bootloader
 from .models.network_configuration import NetworkConfiguration
 from .models.users import User
-from .output import log, error, info, warn, debug
+from .output import log, error, info, warn, debug, flush_log_file
 from .pacman import run_pacman
 from .plugins import plugins
 from .storage import storage
@@ -266,6 +266,7 @@ class Installer:
 		if self.helper_flags.get('base-strapped', False) is True:
 			if filename := storage.get('LOG_FILE', None):
 				absolute_logfile = os.path.join(storage.get('LOG_PATH', './'), filename)
+				flush_log_file()
 
 				if not os.path.isdir(f"{self.target}/{os.path.dirname(absolute_logfile)}"):
 					os.makedirs(f"{self.target}/{os.path.dirname(absolute_logfile)}")
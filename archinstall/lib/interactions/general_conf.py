@@ -1,9 +1,10 @@
 from __future__ import annotations
 
 import pathlib
-from typing import List, Any, Optional, TYPE_CHECKING
+from functools import lru_cache
+from typing import List, Any, Optional, Set, Tuple, TYPE_CHECKING
 
-from ..locale import list_timezones, list_keyboard_languages
+from ..locale import list_timezones
 from ..menu import MenuSelectionType, Menu, TextInput
 from ..output import warn
 from ..packages.packages import validate_package_list
@@ -14,16 +15,24 @@ if TYPE_CHECKING:
 	_: Any
 
 
+# Package names already looked up by ask_additional_packages_to_install()
+_pkg_valid_cache: Set[str] = set()
+_pkg_invalid_cache: Set[str] = set()
+
+
+@lru_cache(maxsize=1)
+def _cached_timezones() -> Tuple[str, ...]:
+	return tuple(list_timezones())
+
+
 def ask_ntp(preset: bool = True) -> bool:
 	prompt = str(_('Would you like to use automatic time synchronization (NTP) with the default time servers?\n'))
 	prompt += str(_('Hardware time and other post-configuration steps might be required in order for NTP to work.\nFor more information, please check the Arch wiki'))
-	if preset:
-		preset_val = Menu.yes()
-	else:
-		preset_val = Menu.no()
-	choice = Menu(prompt, Menu.yes_no(), skip=False, preset_values=preset_val, default_option=Menu.yes()).run()
+	yes, no = Menu.yes(), Menu.no()
+	preset_val = yes if preset else no
+	choice = Menu(prompt, [yes, no], skip=False, preset_values=preset_val, default_option=yes).run()
 
-	return False if choice.value == Menu.no() else True
+	return choice.value != no
 
 
 def ask_hostname(preset: str = '') -> str:
@@ -38,7 +47,7 @@ def ask_hostname(preset: str = '') -> str:
 
 
 def ask_for_a_timezone(preset: Optional[str] = None) -> Optional[str]:
-	timezones = list_timezones()
+	timezones = _cached_timezones()
 	default = 'UTC'
 
 	choice = Menu(
@@ -69,32 +78,6 @@ def ask_for_audio_selection(desktop: bool = True, preset: Optional[str] = None)
 	return None
 
 
-def select_language(preset: Optional[str] = None) -> Optional[str]:
-	"""
-	Asks the user to select a language
-	Usually this is combined with :ref:`archinstall.list_keyboard_languages`.
-
-	:return: The language/dictionary key of the selected language
-	:rtype: str
-	"""
-	kb_lang = list_keyboard_languages()
-	# sort alphabetically and then by length
-	sorted_kb_lang = sorted(sorted(list(kb_lang)), key=len)
-
-	choice = Menu(
-		_('Select keyboard layout'),
-		sorted_kb_lang,
-		preset_values=preset,
-		sort=False
-	).run()
-
-	match choice.type_:
-		case MenuSelectionType.Skip: return preset
-		case MenuSelectionType.Selection: return choice.single_value
-
-	return None
-
-
 def select_archinstall_language(languages: List[Language], preset: Language) -> Language:
 	# these are the displayed language names which can either be
 	# the english name of a language or, if present, the
@@ -137,7 +120,15 @@ def ask_additional_packages_to_install(preset: List[str] = []) -> List[str]:
 			if len(packages):
 				# Verify packages that were given
 				print(_("Verifying that additional packages exist (this might take a few seconds)"))
-				valid, invalid = validate_package_list(packages)
+				# only look up packages we have not seen before
+				unknown = [p for p in packages if p not in _pkg_valid_cache and p not in _pkg_invalid_cache]
+				if unknown:
+					valid, invalid = validate_package_list(unknown)
+					_pkg_valid_cache.update(valid)
+					_pkg_invalid_cache.update(invalid)
+
+				valid = [p for p in packages if p in _pkg_valid_cache]
+				invalid = [p for p in packages if p in _pkg_invalid_cache]
 
 				if invalid:
 					warn(f"Some packages could not be found in the repository: {invalid}")
@@ -168,15 +159,12 @@ def add_number_of_parrallel_downloads(input_number :Optional[int] = None) -> Opt
 			print(_(f"Invalid input! Try again with a valid input [1 to {max_downloads}, or 0 to disable]"))
 
 	pacman_conf_path = pathlib.Path("/etc/pacman.conf")
-	with pacman_conf_path.open() as f:
-		pacman_conf = f.read().split("\n")
-
-	with pacman_conf_path.open("w") as fwrite:
-		for line in pacman_conf:
-			if "ParallelDownloads" in line:
-				fwrite.write(f"ParallelDownloads = {input_number+1}\n") if not input_number == 0 else fwrite.write("#ParallelDownloads = 0\n")
-			else:
-				fwrite.write(f"{line}\n")
+	pacman_conf = pacman_conf_path.read_text().splitlines()
+
+	parallel_downloads = f"ParallelDownloads = {input_number+1}" if not input_number == 0 else "#ParallelDownloads = 0"
+	pacman_conf = [parallel_downloads if "ParallelDownloads" in line else line for line in pacman_conf]
+
+	pacman_conf_path.write_text('\n'.join(pacman_conf) + '\n')
 
 	return input_number
 
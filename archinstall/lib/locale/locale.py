@@ -1,4 +1,5 @@
-from typing import Iterator, List
+from functools import lru_cache
+from typing import Iterator, List, Tuple
 
 from ..exceptions import ServiceException, SysCallError
 from ..general import SysCommand
@@ -10,6 +11,15 @@ def list_keyboard_languages() -> Iterator[str]:
 		yield line.decode('UTF-8').strip()
 
 
+@lru_cache(maxsize=1)
+def sorted_keyboard_languages() -> Tuple[str, ...]:
+	"""
+	Returns the keyboard layouts sorted by length and alphabetically
+	within the same length, the lookup is done once per process
+	"""
+	return tuple(sorted(list_keyboard_languages(), key=lambda lang: (len(lang), lang)))
+
+
 def list_locales() -> List[str]:
 	with open('/etc/locale.gen', 'r') as fp:
 		locales = []
@@ -1,7 +1,7 @@
 from dataclasses import dataclass
 from typing import Dict, Any, TYPE_CHECKING, Optional
 
-from .locale import set_kb_layout, list_keyboard_languages, list_locales
+from .locale import set_kb_layout, sorted_keyboard_languages, list_locales
 from ..menu import Selector, AbstractSubMenu, MenuSelectionType, Menu
 
 if TYPE_CHECKING:
@@ -137,13 +137,9 @@ def select_kb_layout(preset: Optional[str] = None) -> Optional[str]:
 	:return: The language/dictionary key of the selected language
 	:rtype: str
 	"""
-	kb_lang = list_keyboard_languages()
-	# sort alphabetically and then by length
-	sorted_kb_lang = sorted(sorted(list(kb_lang)), key=len)
-
 	choice = Menu(
 		_('Select keyboard layout'),
-		sorted_kb_lang,
+		list(sorted_keyboard_languages()),
 		preset_values=preset,
 		sort=False
 	).run()
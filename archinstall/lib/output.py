@@ -1,15 +1,29 @@
+import atexit
 import logging
 import os
 import sys
 from enum import Enum
+from functools import lru_cache
 
 from pathlib import Path
-from typing import Dict, Union, List, Any, Callable, Optional
+from typing import Dict, Union, List, Any, Callable, Optional, TextIO, Tuple
 from dataclasses import asdict, is_dataclass
 
 from .storage import storage
 
 
+# Log file handle kept open across log() calls, see _get_log_fp()
+_LOG_FP: Optional[TextIO] = None
+_LOG_PATH_CACHED: Optional[Path] = None
+
+# Log file last verified to be writable by check_log_permissions()
+_log_perm_checked: Optional[Path] = None
+
+
+# Turns a table key into its header, e.g. '!pass_word' -> 'pass word'
+_HEADER_TABLE = str.maketrans({'!': None, '_': ' '})
+
+
 class FormattedOutput:
 	@classmethod
 	def values(
@@ -60,82 +74,167 @@ class FormattedOutput:
 		"""
 		raw_data = [cls.values(o, class_formatter, filter_list) for o in obj]
 
-		# determine the maximum column size
+		# determine the maximum column size and stringify each value only once,
+		# the values are stored alongside a flag if they should be right aligned
+		filter_keys = set(filter_list)
 		column_width: Dict[str, int] = {}
+		records: List[Dict[str, Tuple[str, bool]]] = []
 		for o in raw_data:
+			record: Dict[str, Tuple[str, bool]] = {}
 			for k, v in o.items():
-				if not filter_list or k in filter_list:
-					column_width.setdefault(k, 0)
-					column_width[k] = max([column_width[k], len(str(v)), len(k)])
+				if not filter_keys or k in filter_keys:
+					value = str(v)
+					is_numeric = isinstance(v, (int, float)) or (isinstance(v, str) and v.isnumeric())
+					record[k] = (value, is_numeric)
+					column_width[k] = max(column_width.get(k, 0), len(value), len(k))
+			records.append(record)
 
 		if not filter_list:
 			filter_list = list(column_width.keys())
 
 		# create the header lines
-		output = ''
+		parts: List[str] = []
 		key_list = []
 		for key in filter_list:
 			width = column_width[key]
-			key = key.replace('!', '').replace('_', ' ')
+			key = key.translate(_HEADER_TABLE)
 
 			if capitalize:
 				key = key.capitalize()
 
 			key_list.append(key.ljust(width))
 
-		output += ' | '.join(key_list) + '\n'
-		output += '-' * len(output) + '\n'
+		header = ' | '.join(key_list)
+		parts.append(header)
+		parts.append('-' * (len(header) + 1))
+
+		# keys containing '!' have their values hidden
+		redact = {key: '!' in key for key in filter_list}
 
 		# create the data lines
-		for record in raw_data:
+		for record in records:
 			obj_data = []
 			for key in filter_list:
 				width = column_width.get(key, len(key))
-				value = record.get(key, '')
-				if '!' in key:
-					value = '*' * width
-				if isinstance(value,(int, float)) or (isinstance(value, str) and value.isnumeric()):
-					obj_data.append(str(value).rjust(width))
+				value, is_numeric = record.get(key, ('', False))
+				if redact[key]:
+					value, is_numeric = '*' * width, False
+				if is_numeric:
+					obj_data.append(value.rjust(width))
 				else:
-					obj_data.append(str(value).ljust(width))
-			output += ' | '.join(obj_data) + '\n'
+					obj_data.append(value.ljust(width))
+			parts.append(' | '.join(obj_data))
 
-		return output
+		return '\n'.join(parts) + '\n'
 
 	@classmethod
 	def as_columns(cls, entries: List[str], cols: int) -> str:
-		chunks = []
-		output = ''
+		parts: List[str] = []
+		out_fmt = '{: <30} ' * cols
 
 		for i in range(0, len(entries), cols):
-			chunks.append(entries[i:i + cols])
+			row = entries[i:i + cols]
+			# only the last row can be shorter than the others
+			row_fmt = out_fmt if len(row) == cols else '{: <30} ' * len(row)
+			parts.append(row_fmt.format(*row) + '\n')
+
+		return ''.join(parts)
 
-		for row in chunks:
-			out_fmt = '{: <30} ' * len(row)
-			output += out_fmt.format(*row) + '\n'
 
-		return output
+# Whether debug lines are printed, kept in sync with the arguments through set_verbose()
+_VERBOSE = False
+
+
+def set_verbose(verbose: bool) -> None:
+	global _VERBOSE
+	_VERBOSE = verbose
+
+
+# The journald logger is set up on first use, None if systemd is not available
+_journald_initialized = False
+_journald_adapter: Optional[logging.Logger] = None
 
 
 class Journald:
 	@staticmethod
 	def log(message: str, level: int = logging.DEBUG) -> None:
-		try:
-			import systemd.journal  # type: ignore
-		except ModuleNotFoundError:
-			return None
+		global _journald_initialized, _journald_adapter
+
+		if not _journald_initialized:
+			_journald_initialized = True
+
+			try:
+				import systemd.journal  # type: ignore
+			except ModuleNotFoundError:
+				return None
+
+			log_adapter = logging.getLogger('archinstall')
+			log_fmt = logging.Formatter("[%(levelname)s]: %(message)s")
+			log_ch = systemd.journal.JournalHandler()
+			log_ch.setFormatter(log_fmt)
+			log_adapter.addHandler(log_ch)
+			log_adapter.setLevel(logging.DEBUG)
+
+			_journald_adapter = log_adapter
+
+		if _journald_adapter is not None:
+			_journald_adapter.log(level, message)
+
+
+def _close_log_fp() -> None:
+	global _LOG_FP, _LOG_PATH_CACHED
+
+	if _LOG_FP is not None:
+		_LOG_FP.close()
+
+	_LOG_FP = None
+	_LOG_PATH_CACHED = None
+
+
+atexit.register(_close_log_fp)
+
+
+def _get_log_fp(filename: str) -> TextIO:
+	"""
+	Returns a buffered handle to the current log file, re-opening it
+	only if LOG_FILE or LOG_PATH has changed since the last call.
+	"""
+	global _LOG_FP, _LOG_PATH_CACHED
+
+	absolute_logfile = storage.get('LOG_PATH', Path('./')) / filename
+
+	if _LOG_FP is None or absolute_logfile != _LOG_PATH_CACHED:
+		_close_log_fp()
+		_LOG_FP = open(absolute_logfile, 'a', buffering=8192)
+		_LOG_PATH_CACHED = absolute_logfile
 
-		log_adapter = logging.getLogger('archinstall')
-		log_fmt = logging.Formatter("[%(levelname)s]: %(message)s")
-		log_ch = systemd.journal.JournalHandler()
-		log_ch.setFormatter(log_fmt)
-		log_adapter.addHandler(log_ch)
-		log_adapter.setLevel(logging.DEBUG)
+	return _LOG_FP
 
-		log_adapter.log(level, message)
+
+def flush_log_file() -> None:
+	"""
+	Writes any buffered log lines to disk, required before
+	the log file is read or copied elsewhere.
+	"""
+	if _LOG_FP is not None:
+		_LOG_FP.flush()
+
+
+def _flush_before_fork() -> None:
+	flush_log_file()
+
+	if sys.stdout is not None:
+		sys.stdout.flush()
+
+
+# A forked child inherits the unwritten log file and stdout buffers and
+# would write them out a second time, so both are emptied before forking
+os.register_at_fork(before=_flush_before_fork)
 
 
 def check_log_permissions():
+	global _log_perm_checked
+
 	filename = storage.get('LOG_FILE', None)
 
 	if not filename:
@@ -144,6 +243,10 @@ def check_log_permissions():
 	log_dir = storage.get('LOG_PATH', Path('./'))
 	absolute_logfile = log_dir / filename
 
+	# Already verified, changing LOG_FILE or LOG_PATH triggers a new check
+	if absolute_logfile == _log_perm_checked:
+		return
+
 	try:
 		log_dir.mkdir(exist_ok=True, parents=True)
 		with absolute_logfile.open('a') as fp:
@@ -151,14 +254,17 @@ def check_log_permissions():
 	except PermissionError:
 		# Fallback to creating the log file in the current folder
 		fallback_log_file = Path('./').absolute() / filename
-		absolute_logfile = fallback_log_file
-		absolute_logfile.mkdir(exist_ok=True, parents=True)
+		fallback_log_file.touch(exist_ok=True)
 		storage['LOG_PATH'] = Path('./').absolute()
 
 		err_string = f"Not enough permission to place log file at {absolute_logfile}, creating it in {fallback_log_file} instead."
+		absolute_logfile = fallback_log_file
 		warn(err_string)
 
+	_log_perm_checked = absolute_logfile
 
+
+@lru_cache(maxsize=1)
 def _supports_color() -> bool:
 	"""
 	Found first reference here:
@@ -176,6 +282,57 @@ def _supports_color() -> bool:
 	return supported_platform and is_a_tty
 
 
+_USE_COLOR = _supports_color()
+
+
+def _invalidate_color_cache() -> None:
+	"""
+	Re-evaluates the color support, e.g. after sys.stdout was replaced
+	"""
+	global _USE_COLOR
+	_supports_color.cache_clear()
+	_USE_COLOR = _supports_color()
+
+
+# https://www.lihaoyi.com/post/BuildyourownCommandLinewithANSIescapecodes.html#256-colors
+# Extended 256-bit colors (teal, orange, gray etc.) are not always supported
+_FOREGROUND: Dict[str, str] = {
+	'black': '30',
+	'red': '31',
+	'green': '32',
+	'yellow': '33',
+	'blue': '34',
+	'magenta': '35',
+	'cyan': '36',
+	'white': '37',
+	'teal': '38;5;109',
+	'orange': '38;5;208',
+	'darkorange': '38;5;202',
+	'gray': '38;5;246',
+	'grey': '38;5;246',
+	'darkgray': '38;5;240',
+	'lightgray': '38;5;256'
+}
+
+_BACKGROUND: Dict[str, str] = {
+	'black': '40',
+	'red': '41',
+	'green': '42',
+	'yellow': '43',
+	'blue': '44',
+	'magenta': '45',
+	'cyan': '46',
+	'white': '47',
+	'teal': '48;5;109',
+	'orange': '48;5;208',
+	'darkorange': '48;5;202',
+	'gray': '48;5;246',
+	'grey': '48;5;246',
+	'darkgray': '48;5;240',
+	'lightgray': '48;5;256'
+}
+
+
 class Font(Enum):
 	bold = '1'
 	italic = '3'
@@ -190,7 +347,7 @@ def _stylize_output(
 	fg: str,
 	bg: Optional[str],
 	reset: bool,
-	font: List[Font] = [],
+	font: Tuple[Font, ...] = (),
 ) -> str:
 	"""
 	Heavily influenced by:
@@ -200,38 +357,16 @@ def _stylize_output(
 
 	Adds styling to a text given a set of color arguments.
 	"""
-	colors = {
-		'black' : '0',
-		'red' : '1',
-		'green' : '2',
-		'yellow' : '3',
-		'blue' : '4',
-		'magenta' : '5',
-		'cyan' : '6',
-		'white' : '7',
-		'teal' : '8;5;109',      # Extended 256-bit colors (not always supported)
-		'orange' : '8;5;208',    # https://www.lihaoyi.com/post/BuildyourownCommandLinewithANSIescapecodes.html#256-colors
-		'darkorange' : '8;5;202',
-		'gray' : '8;5;246',
-		'grey' : '8;5;246',
-		'darkgray' : '8;5;240',
-		'lightgray' : '8;5;256'
-	}
-
-	foreground = {key: f'3{colors[key]}' for key in colors}
-	background = {key: f'4{colors[key]}' for key in colors}
-	code_list = []
-
 	if text == '' and reset:
 		return '\x1b[%sm' % '0'
 
-	code_list.append(foreground[str(fg)])
+	code_list = [_FOREGROUND[fg]]
 
 	if bg:
-		code_list.append(background[str(bg)])
+		code_list.append(_BACKGROUND[bg])
 
-	for o in font:
-		code_list.append(o.value)
+	if font:
+		code_list.extend(o.value for o in font)
 
 	ansi = ';'.join(code_list)
 
@@ -244,7 +379,7 @@ def info(
 	fg: str = 'white',
 	bg: Optional[str] = None,
 	reset: bool = False,
-	font: List[Font] = []
+	font: Tuple[Font, ...] = ()
 ):
 	log(*msgs, level=level, fg=fg, bg=bg, reset=reset, font=font)
 
@@ -254,7 +389,7 @@ def debug(
 	fg: str = 'white',
 	bg: Optional[str] = None,
 	reset: bool = False,
-	font: List[Font] = []
+	font: Tuple[Font, ...] = ()
 ):
 	log(*msgs, level=level, fg=fg, bg=bg, reset=reset, font=font)
 
@@ -264,7 +399,7 @@ def error(
 	fg: str = 'red',
 	bg: Optional[str] = None,
 	reset: bool = False,
-	font: List[Font] = []
+	font: Tuple[Font, ...] = ()
 ):
 	log(*msgs, level=level, fg=fg, bg=bg, reset=reset, font=font)
 
@@ -275,7 +410,7 @@ def warn(
 	fg: str = 'yellow',
 	bg: Optional[str] = None,
 	reset: bool = False,
-	font: List[Font] = []
+	font: Tuple[Font, ...] = ()
 ):
 	log(*msgs, level=level, fg=fg, bg=bg, reset=reset, font=font)
 
@@ -286,29 +421,44 @@ def log(
 	fg: str = 'white',
 	bg: Optional[str] = None,
 	reset: bool = False,
-	font: List[Font] = []
+	font: Tuple[Font, ...] = ()
 ):
-	text = orig_string = ' '.join([str(x) for x in msgs])
+	# Lines are printed unless they're debug output and we're not verbose
+	visible = level != logging.DEBUG or _VERBOSE
+	filename = storage.get('LOG_FILE', None)
+	journald_unavailable = _journald_initialized and _journald_adapter is None
+
+	# Nothing will consume the message, skip building it
+	if not visible and not filename and journald_unavailable:
+		return
 
-	# Attempt to colorize the output if supported
-	# Insert default colors and override with **kwargs
-	if _supports_color():
-		text = _stylize_output(text, fg, bg, reset, font)
+	orig_string = ' '.join([str(x) for x in msgs])
 
 	# If a logfile is defined in storage,
 	# we use that one to output everything
-	if filename := storage.get('LOG_FILE', None):
-		log_dir = storage.get('LOG_PATH', Path('./'))
-		absolute_logfile = log_dir / filename
+	if filename:
+		fp = _get_log_fp(filename)
+		fp.write(f"{orig_string}\n")
 
-		with open(absolute_logfile, 'a') as fp:
-			fp.write(f"{orig_string}\n")
+		if level >= logging.WARN:
+			fp.flush()
 
-	Journald.log(text, level=level)
+	Journald.log(orig_string, level=level)
 
 	# Finally, print the log unless we skipped it based on level.
-	# We use sys.stdout.write()+flush() instead of print() to try and
-	# fix issue #94
-	if level != logging.DEBUG or storage.get('arguments', {}).get('verbose', False):
+	# We use sys.stdout.write() instead of print() to try and
+	# fix issue #94. A TTY is line buffered already, so only warnings
+	# and errors are flushed explicitly, everything else is left to
+	# the buffer so bursts of output on a pipe are written together.
+	if visible:
+		text = orig_string
+
+		# Attempt to colorize the output if supported
+		# Insert default colors and override with **kwargs
+		if _USE_COLOR:
+			text = _stylize_output(text, fg, bg, reset, font)
+
 		sys.stdout.write(f"{text}\n")
-		sys.stdout.flush()
+
+		if level >= logging.WARN:
+			sys.stdout.flush()
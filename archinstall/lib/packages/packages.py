@@ -1,6 +1,7 @@
 import dataclasses
 import json
 import ssl
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, Any, Tuple, List
 from urllib.error import HTTPError
 from urllib.parse import urlencode
@@ -97,8 +98,13 @@ def validate_package_list(packages :list) -> Tuple[list, list]:
 	return: Tuple of lists containing valid packavges in the first and invalid
 	packages in the second entry
 	"""
-	valid_packages = {package for package in packages if find_package(package)}
-	invalid_packages = set(packages) - valid_packages
+	# each lookup is a separate web request, so run them concurrently
+	unique_packages = list(set(packages))
+	with ThreadPoolExecutor(max_workers=8) as executor:
+		found = executor.map(find_package, unique_packages)
+
+	valid_packages = {package for package, results in zip(unique_packages, found) if results}
+	invalid_packages = set(unique_packages) - valid_packages
 
 	return list(valid_packages), list(invalid_packages)
 
@@ -1,31 +1,101 @@
+import ctypes
+import ctypes.util
+import os
 import pathlib
+import select
 import time
-from typing import TYPE_CHECKING, Any
+from typing import TYPE_CHECKING, Any, Optional
 
+from .exceptions import PacmanLockTimeout
 from .general import SysCommand
-from .output import warn, error
+from .output import warn, error, debug
 
 if TYPE_CHECKING:
 	_: Any
 
 
+# Flags taken from <sys/inotify.h>
+_IN_DELETE = 0x00000200
+_IN_MOVED_FROM = 0x00000040
+_IN_NONBLOCK = os.O_NONBLOCK
+_IN_CLOEXEC = os.O_CLOEXEC
+
+
+def _inotify_watch(directory: pathlib.Path, mask: int) -> Optional[int]:
+	"""
+	Sets up an inotify watch on the given directory through libc.
+	Returns the inotify file descriptor, or None if inotify is not available.
+	"""
+	try:
+		libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+		fd = libc.inotify_init1(_IN_NONBLOCK | _IN_CLOEXEC)
+	except (OSError, AttributeError) as err:
+		debug(f'inotify is not available: {err}')
+		return None
+
+	if fd < 0:
+		debug(f'inotify_init1() failed: {os.strerror(ctypes.get_errno())}')
+		return None
+
+	if libc.inotify_add_watch(fd, os.fsencode(directory), mask) < 0:
+		debug(f'inotify_add_watch() failed on {directory}: {os.strerror(ctypes.get_errno())}')
+		os.close(fd)
+		return None
+
+	return fd
+
+
+def _wait_for_removal(path: pathlib.Path, timeout: float) -> bool:
+	"""
+	Blocks until the given path no longer exists or the timeout (in seconds) expires.
+	Uses inotify to wake up as soon as the file is removed and falls back to polling.
+	Returns True if the path was removed within the timeout.
+	"""
+	deadline = time.monotonic() + timeout
+	path_str = str(path)
+	fd = _inotify_watch(path.parent, _IN_DELETE | _IN_MOVED_FROM)
+
+	if fd is None:
+		while os.path.exists(path_str):
+			if time.monotonic() > deadline:
+				return False
+			time.sleep(0.25)
+		return True
+
+	try:
+		# the watch is set up before checking, so a removal
+		# in between the two can not be missed
+		while os.path.exists(path_str):
+			remaining = deadline - time.monotonic()
+			if remaining <= 0:
+				return False
+
+			readable, _w, _x = select.select([fd], [], [], remaining)
+			if readable:
+				# drain the queued events, we only care that something changed
+				try:
+					while os.read(fd, 4096):
+						pass
+				except BlockingIOError:
+					pass
+		return True
+	finally:
+		os.close(fd)
+
+
 def run_pacman(args :str, default_cmd :str = 'pacman') -> SysCommand:
 	"""
 	A centralized function to call `pacman` from.
 	It also protects us from colliding with other running pacman sessions (if used locally).
-	The grace period is set to 10 minutes before exiting hard if another pacman instance is running.
+	The grace period is set to 10 minutes before raising PacmanLockTimeout if another pacman instance is running.
 	"""
 	pacman_db_lock = pathlib.Path('/var/lib/pacman/db.lck')
 
 	if pacman_db_lock.exists():
 		warn(_('Pacman is already running, waiting maximum 10 minutes for it to terminate.'))
 
-	started = time.time()
-	while pacman_db_lock.exists():
-		time.sleep(0.25)
-
-		if time.time() - started > (60 * 10):
+		if not _wait_for_removal(pacman_db_lock, 60 * 10):
 			error(_('Pre-existing pacman lock never exited. Please clean up any existing pacman sessions before using archinstall.'))
-			exit(1)
+			raise PacmanLockTimeout(f'Timed out waiting for {pacman_db_lock} to be removed')
 
 	return SysCommand(f'{default_cmd} {args}')